@@ -1,7 +1,12 @@
-import { describe, test, expect } from "vitest";
+import { describe, test, expect, beforeEach, afterEach, vi } from "vitest";
+import { mkdtemp, readFile, rm } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import path from "node:path";
 import { getAllTools, getTool, getRecommendations, useCaseRecommendations } from "../diagrams/registry.js";
 import { getGuidelines } from "../diagrams/guidelines/index.js";
-import { describeOperation } from "../operations/describe-ops.js";
+import { describeOperation, generateToolGuide, getPrecomputedGuide } from "../operations/describe-ops.js";
+import { renderOperation } from "../operations/render-ops.js";
+import { clearRenderCache } from "../render-cache.js";
 import type { CallToolResult } from "@modelcontextprotocol/sdk/types.js";
 
 function getText(result: CallToolResult): string {
@@ -273,6 +278,28 @@ describe("describeOperation", () => {
       expect(text).toContain("Container");
     });
 
+    test("should return guide for subDiagram only defined in guidelines", async () => {
+      const result = await describeOperation.execute({ tool: "d2", subDiagram: "styling" });
+      const text = getText(result);
+
+      expect(text).toContain("D2 - styling");
+      expect(text).toContain("Styling Syntax");
+    });
+
+    test("should precompute the generated guide for every tool and sub-diagram", () => {
+      for (const tool of getAllTools()) {
+        expect(getPrecomputedGuide(tool.id)).toBe(generateToolGuide(tool.id));
+
+        const subDiagramIds = [
+          ...tool.subDiagrams.map(s => s.id),
+          ...Object.keys(getGuidelines(tool.id)?.subDiagrams ?? {}),
+        ];
+        for (const id of subDiagramIds) {
+          expect(getPrecomputedGuide(tool.id, id)).toBe(generateToolGuide(tool.id, id));
+        }
+      }
+    });
+
     test("should fallback for unknown subDiagram with guidelines", async () => {
       const result = await describeOperation.execute({ tool: "mermaid", subDiagram: "pie" });
       const text = getText(result);
@@ -311,6 +338,88 @@ describe("describeOperation", () => {
   });
 });
 
+// ─── Render Operation tests ───────────────────────────────────────────────
+
+describe("renderOperation", () => {
+  let tempDir: string;
+
+  beforeEach(async () => {
+    clearRenderCache();
+    tempDir = await mkdtemp(path.join(tmpdir(), "kroki-render-"));
+    process.env.KROKI_CACHE_DIR = path.join(tempDir, "cache");
+  });
+
+  afterEach(async () => {
+    vi.unstubAllGlobals();
+    delete process.env.KROKI_CACHE_DIR;
+    await rm(tempDir, { recursive: true, force: true });
+  });
+
+  function mockKroki(body: string, status = 200) {
+    const fetchMock = vi.fn(async () => new Response(body, { status }));
+    vi.stubGlobal("fetch", fetchMock);
+    return fetchMock;
+  }
+
+  test("should return SVG as text", async () => {
+    mockKroki("<svg>ok</svg>");
+    const result = await renderOperation.execute({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" });
+
+    expect(result.isError).toBeUndefined();
+    expect(getText(result)).toBe("<svg>ok</svg>");
+  });
+
+  test("should return PNG as base64 image", async () => {
+    mockKroki("PNGDATA");
+    const result = await renderOperation.execute({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "png" });
+
+    expect(result.content[0]).toEqual({
+      type: "image",
+      data: Buffer.from("PNGDATA").toString("base64"),
+      mimeType: "image/png",
+    });
+  });
+
+  test("should save to output_path", async () => {
+    mockKroki("<svg>ok</svg>");
+    const outputPath = path.join(tempDir, "out.svg");
+    const result = await renderOperation.execute({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg", output_path: outputPath });
+
+    expect(getText(result)).toBe(`Saved to ${outputPath}`);
+    expect(await readFile(outputPath, "utf-8")).toBe("<svg>ok</svg>");
+  });
+
+  test("should return error for unknown tool without calling Kroki", async () => {
+    const fetchMock = mockKroki("");
+    const result = await renderOperation.execute({ tool: "nonexistent", diagram: "x", format: "svg" });
+
+    expect(result.isError).toBe(true);
+    expect(getText(result)).toContain("Unknown tool");
+    expect(getText(result)).toContain("mermaid");
+    expect(fetchMock).toHaveBeenCalledTimes(0);
+  });
+
+  test.each(["", "  \n "])("should reject empty diagram %j in argsSchema", (diagram) => {
+    const parsed = renderOperation.argsSchema.safeParse({ tool: "mermaid", diagram });
+
+    expect(parsed.success).toBe(false);
+  });
+
+  test("should accept non-empty diagram in argsSchema", () => {
+    const parsed = renderOperation.argsSchema.safeParse({ tool: "mermaid", diagram: "flowchart TD\n  A-->B" });
+
+    expect(parsed.success).toBe(true);
+  });
+
+  test("should surface Kroki errors", async () => {
+    mockKroki("Syntax error", 400);
+    const result = await renderOperation.execute({ tool: "mermaid", diagram: "invalid", format: "svg" });
+
+    expect(result.isError).toBe(true);
+    expect(getText(result)).toBe("Kroki error (400): Syntax error");
+  });
+});
+
 // ─── Operation metadata tests ─────────────────────────────────────────────
 
 describe("Operation metadata", () => {
@@ -321,4 +430,12 @@ describe("Operation metadata", () => {
     expect(describeOperation.argsSchema).toBeDefined();
     expect(typeof describeOperation.execute).toBe("function");
   });
+
+  test("renderOperation has correct metadata", () => {
+    expect(renderOperation.id).toBe("render");
+    expect(renderOperation.summary).toBeTruthy();
+    expect(renderOperation.detail).toBeTruthy();
+    expect(renderOperation.argsSchema).toBeDefined();
+    expect(typeof renderOperation.execute).toBe("function");
+  });
 });
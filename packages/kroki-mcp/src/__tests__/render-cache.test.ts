@@ -0,0 +1,302 @@
+import { describe, test, expect, beforeEach, afterEach, vi } from "vitest";
+import { mkdtemp, readdir, readFile, rm, utimes, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import path from "node:path";
+import {
+  RENDER_CACHE_MAX_ENTRIES,
+  clearRenderCache,
+  diskCachePath,
+  encodeBase64,
+  getCacheDir,
+  getCachedRender,
+  readDiskCache,
+  renderCacheKey,
+  renderCacheSize,
+  saveRender,
+  setCachedRender,
+  sweepDiskCache,
+  writeDiskCache,
+} from "../render-cache.js";
+import type { RenderCacheEntry } from "../render-cache.js";
+import { getKrokiUrl, renderDiagram } from "../kroki-client.js";
+import type { RenderResult } from "../kroki-client.js";
+
+function contentOf(result: RenderResult) {
+  return result.success ? result.entry.content : undefined;
+}
+
+function mockKroki(body: string, status = 200) {
+  const fetchMock = vi.fn(async () => new Response(body, { status }));
+  vi.stubGlobal("fetch", fetchMock);
+  return fetchMock;
+}
+
+// ─── Render cache tests ───────────────────────────────────────────────────
+
+describe("Render cache", () => {
+  beforeEach(() => {
+    clearRenderCache();
+  });
+
+  describe("renderCacheKey", () => {
+    const base = { krokiUrl: "https://kroki.io", tool: "mermaid", format: "svg" as const, diagram: "flowchart TD\n  A-->B" };
+
+    test("should be stable for the same input", () => {
+      expect(renderCacheKey(base)).toBe(renderCacheKey({ ...base }));
+    });
+
+    test.each([
+      ["krokiUrl", { krokiUrl: "http://localhost:8000" }],
+      ["tool", { tool: "plantuml" }],
+      ["format", { format: "png" as const }],
+      ["diagram", { diagram: "flowchart LR\n  A-->B" }],
+    ])("should change when %s changes", (_field, override) => {
+      expect(renderCacheKey({ ...base, ...override })).not.toBe(renderCacheKey(base));
+    });
+  });
+
+  describe("LRU eviction", () => {
+    test("should evict the least recently used entry when full", () => {
+      for (let i = 0; i < RENDER_CACHE_MAX_ENTRIES; i++) {
+        setCachedRender(`key-${i}`, { content: Buffer.from(String(i)) });
+      }
+
+      // Touch the oldest entry so key-1 becomes the eviction candidate
+      expect(getCachedRender("key-0")).toBeDefined();
+      setCachedRender("overflow", { content: Buffer.from("overflow") });
+
+      expect(renderCacheSize()).toBe(RENDER_CACHE_MAX_ENTRIES);
+      expect(getCachedRender("key-0")).toBeDefined();
+      expect(getCachedRender("key-1")).toBeUndefined();
+      expect(getCachedRender("overflow")).toBeDefined();
+    });
+  });
+
+  describe("encodeBase64", () => {
+    test("should encode binary content once and memoize it on the entry", () => {
+      const entry: RenderCacheEntry = { content: Buffer.from("PNGDATA") };
+
+      const first = encodeBase64(entry);
+      expect(first).toBe(Buffer.from("PNGDATA").toString("base64"));
+      expect(entry.base64).toBe(first);
+
+      entry.content = Buffer.from("changed");
+      expect(encodeBase64(entry)).toBe(first);
+    });
+  });
+});
+
+// ─── Disk tier tests ──────────────────────────────────────────────────────
+
+describe("Disk cache", () => {
+  let cacheDir: string;
+
+  beforeEach(async () => {
+    cacheDir = await mkdtemp(path.join(tmpdir(), "kroki-cache-"));
+    process.env.KROKI_CACHE_DIR = cacheDir;
+  });
+
+  afterEach(async () => {
+    delete process.env.KROKI_CACHE_DIR;
+    await rm(cacheDir, { recursive: true, force: true });
+  });
+
+  test("should round-trip SVG as text and binary as bytes", async () => {
+    await writeDiskCache("svg-key", "svg", "<svg>ok</svg>");
+    await writeDiskCache("png-key", "png", Buffer.from("PNGDATA"));
+
+    expect(await readDiskCache("svg-key", "svg")).toBe("<svg>ok</svg>");
+    expect(await readDiskCache("png-key", "png")).toEqual(Buffer.from("PNGDATA"));
+  });
+
+  test("should store entries as <key>.<format> without leftover temp files", async () => {
+    await writeDiskCache("abc", "pdf", Buffer.from("PDF"));
+
+    expect(diskCachePath("abc", "pdf")).toBe(path.join(cacheDir, "abc.pdf"));
+    expect(await readdir(cacheDir)).toEqual(["abc.pdf"]);
+  });
+
+  test("should return the stored path", async () => {
+    expect(await writeDiskCache("abc", "svg", "<svg/>")).toBe(path.join(cacheDir, "abc.svg"));
+  });
+
+  test("should return undefined on miss", async () => {
+    expect(await readDiskCache("missing", "svg")).toBeUndefined();
+  });
+
+  test("should sweep least recently used files beyond the limit", async () => {
+    const names = Array.from({ length: 5 }, (_, i) => `${String(i).repeat(64)}.svg`);
+    for (const [i, name] of names.entries()) {
+      const file = path.join(cacheDir, name);
+      await writeFile(file, String(i));
+      const time = new Date(Date.now() - (5 - i) * 60_000);
+      await utimes(file, time, time);
+    }
+
+    await sweepDiskCache({ dir: cacheDir, maxEntries: 3 });
+
+    expect((await readdir(cacheDir)).sort()).toEqual(names.slice(2));
+  });
+
+  test("should leave files that are not cache entries alone when sweeping", async () => {
+    const old = new Date(Date.now() - 60 * 60_000);
+    for (const name of ["notes.txt", "diagram.svg", `${"a".repeat(64)}.svg.tmp`]) {
+      await writeFile(path.join(cacheDir, name), "user data");
+      await utimes(path.join(cacheDir, name), old, old);
+    }
+    await writeFile(path.join(cacheDir, `${"b".repeat(64)}.svg`), "<svg/>");
+
+    await sweepDiskCache({ dir: cacheDir, maxEntries: 0 });
+
+    expect((await readdir(cacheDir)).sort()).toEqual([`${"a".repeat(64)}.svg.tmp`, "diagram.svg", "notes.txt"]);
+  });
+
+  test.each(["off", ""])("should be disabled by KROKI_CACHE_DIR=%j", async (value) => {
+    process.env.KROKI_CACHE_DIR = value;
+
+    expect(getCacheDir()).toBeUndefined();
+    expect(await writeDiskCache("abc", "svg", "<svg/>")).toBeUndefined();
+    expect(await readDiskCache("abc", "svg")).toBeUndefined();
+    expect(await readdir(cacheDir)).toEqual([]);
+  });
+});
+
+// ─── saveRender tests ─────────────────────────────────────────────────────
+
+describe("saveRender", () => {
+  let tempDir: string;
+
+  beforeEach(async () => {
+    tempDir = await mkdtemp(path.join(tmpdir(), "kroki-save-"));
+  });
+
+  afterEach(async () => {
+    await rm(tempDir, { recursive: true, force: true });
+  });
+
+  test("should copy from the disk cache file when available", async () => {
+    const cachePath = path.join(tempDir, "cached.png");
+    await writeFile(cachePath, "FROM-DISK");
+    const outputPath = path.join(tempDir, "out.png");
+
+    await saveRender({ content: Buffer.from("FROM-MEMORY"), cachePath }, outputPath);
+
+    expect(await readFile(outputPath, "utf-8")).toBe("FROM-DISK");
+  });
+
+  test("should write content when the cache file is gone", async () => {
+    const outputPath = path.join(tempDir, "out.png");
+
+    await saveRender({ content: Buffer.from("FROM-MEMORY"), cachePath: path.join(tempDir, "swept.png") }, outputPath);
+
+    expect(await readFile(outputPath, "utf-8")).toBe("FROM-MEMORY");
+  });
+
+  test("should write content when not backed by disk", async () => {
+    const outputPath = path.join(tempDir, "out.svg");
+
+    await saveRender({ content: "<svg/>" }, outputPath);
+
+    expect(await readFile(outputPath, "utf-8")).toBe("<svg/>");
+  });
+});
+
+// ─── renderDiagram tests ──────────────────────────────────────────────────
+
+describe("renderDiagram", () => {
+  let cacheDir: string;
+
+  beforeEach(async () => {
+    clearRenderCache();
+    cacheDir = await mkdtemp(path.join(tmpdir(), "kroki-cache-"));
+    process.env.KROKI_CACHE_DIR = cacheDir;
+  });
+
+  afterEach(async () => {
+    vi.unstubAllGlobals();
+    delete process.env.KROKI_CACHE_DIR;
+    await rm(cacheDir, { recursive: true, force: true });
+  });
+
+  test("should reuse the disk tier after the in-memory cache is lost", async () => {
+    const fetchMock = mockKroki("<svg>ok</svg>");
+    const params = { tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" as const };
+
+    await renderDiagram(params);
+    clearRenderCache();
+    const result = await renderDiagram(params);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(contentOf(result)).toBe("<svg>ok</svg>");
+    const key = renderCacheKey({ krokiUrl: getKrokiUrl(), ...params });
+    expect(result.success && result.entry.cachePath).toBe(diskCachePath(key, "svg"));
+  });
+
+  test("should call Kroki once for repeated renders", async () => {
+    const fetchMock = mockKroki("<svg>ok</svg>");
+    const params = { tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" as const };
+
+    const first = await renderDiagram(params);
+    const second = await renderDiagram(params);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(contentOf(first)).toBe("<svg>ok</svg>");
+    expect(second).toEqual(first);
+  });
+
+  test("should share one Kroki request between concurrent renders", async () => {
+    const fetchMock = mockKroki("<svg>ok</svg>");
+    const params = { tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" as const };
+
+    const results = await Promise.all([renderDiagram(params), renderDiagram(params), renderDiagram(params)]);
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    results.forEach(r => expect(contentOf(r)).toBe("<svg>ok</svg>"));
+  });
+
+  test("should retry after a failed concurrent render", async () => {
+    const fetchMock = vi.fn(async () => {
+      throw new Error("connection refused");
+    });
+    vi.stubGlobal("fetch", fetchMock);
+    const params = { tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" as const };
+
+    const results = await Promise.allSettled([renderDiagram(params), renderDiagram(params)]);
+    results.forEach(r => expect(r.status).toBe("rejected"));
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+
+    mockKroki("<svg>ok</svg>");
+    const retry = await renderDiagram(params);
+    expect(retry.success).toBe(true);
+  });
+
+  test("should return binary formats as bytes", async () => {
+    mockKroki("PNGDATA");
+
+    const result = await renderDiagram({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "png" });
+
+    expect(contentOf(result)).toEqual(Buffer.from("PNGDATA"));
+  });
+
+  test("should render again when format changes", async () => {
+    const fetchMock = mockKroki("data");
+
+    await renderDiagram({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "svg" });
+    await renderDiagram({ tool: "mermaid", diagram: "flowchart TD\n  A-->B", format: "png" });
+
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+  });
+
+  test("should not cache Kroki errors", async () => {
+    const fetchMock = mockKroki("Syntax error", 400);
+    const params = { tool: "mermaid", diagram: "invalid", format: "svg" as const };
+
+    const result = await renderDiagram(params);
+    await renderDiagram(params);
+
+    expect(result).toEqual({ success: false, error: "Kroki error (400): Syntax error" });
+    expect(fetchMock).toHaveBeenCalledTimes(2);
+    expect(renderCacheSize()).toBe(0);
+    expect(await readdir(cacheDir)).toEqual([]);
+  });
+});
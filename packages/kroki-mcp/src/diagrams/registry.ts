@@ -407,6 +407,11 @@ export const useCaseRecommendations: UseCaseRecommendation[] = [
   },
 ];
 
+/** Lookup map for O(1) access */
+const toolMap = new Map<string, DiagramTool>(
+  diagramTools.map(t => [t.id, t]),
+);
+
 /**
  * Get all diagram tools
  */
@@ -418,7 +423,7 @@ export function getAllTools(): DiagramTool[] {
  * Get a specific diagram tool by ID
  */
 export function getTool(id: string): DiagramTool | undefined {
-  return diagramTools.find(t => t.id === id);
+  return toolMap.get(id);
 }
 
 /**
@@ -0,0 +1,111 @@
+import {
+  diskCachePath,
+  getCachedRender,
+  readDiskCache,
+  renderCacheKey,
+  setCachedRender,
+  writeDiskCache,
+} from "./render-cache.js";
+import type { OutputFormat, RenderCacheEntry } from "./render-cache.js";
+
+export type RenderResult =
+  | { success: true; entry: RenderCacheEntry }
+  | { success: false; error: string };
+
+/**
+ * Base URL of the Kroki server
+ */
+export function getKrokiUrl(): string {
+  return process.env.KROKI_URL ?? "https://kroki.io";
+}
+
+/**
+ * In-flight Kroki requests keyed by cache key.
+ * Concurrent renders of the same diagram share one request instead of all missing the cache.
+ */
+const inflightRenders = new Map<string, Promise<RenderResult>>();
+
+/**
+ * Render a diagram via Kroki.
+ * Output is cached by content hash in memory and on disk, so repeated renders of the same source
+ * (including across server restarts) skip the HTTP round-trip.
+ */
+export async function renderDiagram(params: {
+  tool: string;
+  diagram: string;
+  format: OutputFormat;
+}): Promise<RenderResult> {
+  const { tool, diagram, format } = params;
+  const krokiUrl = getKrokiUrl();
+
+  const key = renderCacheKey({ krokiUrl, tool, format, diagram });
+  const cached = getCachedRender(key);
+  if (cached !== undefined) {
+    return { success: true, entry: cached };
+  }
+
+  let pending = inflightRenders.get(key);
+  if (!pending) {
+    pending = loadRender({ key, krokiUrl, tool, diagram, format })
+      .finally(() => inflightRenders.delete(key));
+    inflightRenders.set(key, pending);
+  }
+  return pending;
+}
+
+/**
+ * Load a render from the disk tier, falling back to Kroki on a miss
+ */
+async function loadRender(params: {
+  key: string;
+  krokiUrl: string;
+  tool: string;
+  diagram: string;
+  format: OutputFormat;
+}): Promise<RenderResult> {
+  const { key, format } = params;
+
+  const stored = await readDiskCache(key, format);
+  if (stored !== undefined) {
+    const entry = { content: stored, cachePath: diskCachePath(key, format) };
+    setCachedRender(key, entry);
+    return { success: true, entry };
+  }
+
+  return fetchRender(params);
+}
+
+/**
+ * Request a render from Kroki and cache successful output
+ */
+async function fetchRender(params: {
+  key: string;
+  krokiUrl: string;
+  tool: string;
+  diagram: string;
+  format: OutputFormat;
+}): Promise<RenderResult> {
+  const { key, krokiUrl, tool, diagram, format } = params;
+
+  const response = await fetch(`${krokiUrl}/${tool}/${format}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "text/plain",
+    },
+    body: diagram,
+  });
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    return { success: false, error: `Kroki error (${response.status}): ${errorText}` };
+  }
+
+  // Read SVG as text directly so it never needs a separate decode pass
+  const content = format === "svg"
+    ? await response.text()
+    : Buffer.from(await response.arrayBuffer());
+  const entry: RenderCacheEntry = { content };
+  setCachedRender(key, entry);
+  entry.cachePath = await writeDiskCache(key, format, content);
+  return { success: true, entry };
+}
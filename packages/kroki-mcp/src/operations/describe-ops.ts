@@ -70,7 +70,7 @@ function generateOverview(): string {
 /**
  * Generate detailed guidelines for a specific tool
  */
-function generateToolGuide(toolId: string, subDiagramId?: string): string {
+export function generateToolGuide(toolId: string, subDiagramId?: string): string {
   const tool = getTool(toolId);
   if (!tool) {
     return `Unknown tool: "${toolId}". Use kroki_describe() to see available tools.`;
@@ -312,6 +312,46 @@ function generateBestPractices(toolId: string, subDiagramId?: string): string {
   return all.map(p => `- ${p}`).join("\n");
 }
 
+/**
+ * Precomputed guide text for a tool and each of its sub-diagrams
+ */
+interface PrecomputedGuide {
+  text: string;
+  subDiagrams: Map<string, string>;
+}
+
+/**
+ * Build every guide that can be served from the static registry
+ */
+function precomputeGuides(): Map<string, PrecomputedGuide> {
+  const guides = new Map<string, PrecomputedGuide>();
+  for (const tool of getAllTools()) {
+    const subDiagramIds = new Set([
+      ...tool.subDiagrams.map(s => s.id),
+      ...Object.keys(getGuidelines(tool.id)?.subDiagrams ?? {}),
+    ]);
+    const subDiagrams = new Map<string, string>();
+    for (const id of subDiagramIds) {
+      subDiagrams.set(id, generateToolGuide(tool.id, id));
+    }
+    guides.set(tool.id, { text: generateToolGuide(tool.id), subDiagrams });
+  }
+  return guides;
+}
+
+// Registry and guidelines are static, so all valid responses are rendered once at load
+const overviewText = generateOverview();
+const precomputedGuides = precomputeGuides();
+
+/**
+ * Look up a precomputed guide (undefined for unknown tool/sub-diagram)
+ */
+export function getPrecomputedGuide(toolId: string, subDiagramId?: string): string | undefined {
+  const guide = precomputedGuides.get(toolId);
+  if (!guide) return undefined;
+  return subDiagramId ? guide.subDiagrams.get(subDiagramId) : guide.text;
+}
+
 export const describeOperation: Operation<DescribeArgs> = {
   id: "list",
   summary: "List diagram tools or get detailed guidelines",
@@ -324,9 +364,9 @@ With tool and subDiagram: Returns focused guide for that diagram type.`,
 
     let text: string;
     if (tool) {
-      text = generateToolGuide(tool, subDiagram);
+      text = getPrecomputedGuide(tool, subDiagram) ?? generateToolGuide(tool, subDiagram);
     } else {
-      text = generateOverview();
+      text = overviewText;
     }
 
     return {
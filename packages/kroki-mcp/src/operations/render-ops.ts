@@ -0,0 +1,95 @@
+import { z } from "zod";
+import type { CallToolResult } from "@modelcontextprotocol/sdk/types.js";
+import type { Operation } from "./types.js";
+import { getAllTools, getTool } from "../diagrams/registry.js";
+import { renderDiagram } from "../kroki-client.js";
+import { encodeBase64, saveRender } from "../render-cache.js";
+import type { OutputFormat } from "../render-cache.js";
+
+/** Matches any non-whitespace character; stops at the first hit without copying the source */
+const NON_WHITESPACE = /\S/;
+
+const RenderArgsSchema = z.object({
+  tool: z.string().describe("Diagram tool ID (e.g., 'mermaid', 'plantuml')"),
+  diagram: z.string()
+    .refine(s => NON_WHITESPACE.test(s), "Diagram source must not be empty")
+    .describe("The diagram source code (non-empty, not just whitespace)"),
+  format: z.enum(["svg", "png", "pdf"]).optional().default("svg").describe("Output format"),
+  output_path: z.string().optional().describe("File path to save the output (optional)"),
+});
+
+type RenderArgs = z.infer<typeof RenderArgsSchema>;
+
+const availableTools = getAllTools().map(t => t.id).join(", ");
+
+const MIME_TYPES: Record<OutputFormat, string> = {
+  svg: "image/svg+xml",
+  png: "image/png",
+  pdf: "application/pdf",
+};
+
+export const renderOperation: Operation<RenderArgs> = {
+  id: "render",
+  summary: "Render a diagram via Kroki",
+  detail: `Renders diagram source with the given tool and returns SVG as text, PNG/PDF as base64 image.
+With output_path: saves the output to that file and returns the path instead.`,
+  argsSchema: RenderArgsSchema,
+  execute: async (args): Promise<CallToolResult> => {
+    const { tool, diagram, format, output_path } = args;
+
+    // Validate tool exists
+    const toolInfo = getTool(tool);
+    if (!toolInfo) {
+      return {
+        content: [{ type: "text", text: `Unknown tool: "${tool}"\n\nAvailable: ${availableTools}` }],
+        isError: true,
+      };
+    }
+
+    // Call Kroki API
+    try {
+      const result = await renderDiagram({ tool, diagram, format });
+
+      if (!result.success) {
+        return {
+          content: [{ type: "text", text: result.error }],
+          isError: true,
+        };
+      }
+
+      const { entry } = result;
+
+      // Save to file if output_path specified (copied from the disk cache file when present;
+      // otherwise binary is written as-is and SVG text is re-encoded as UTF-8)
+      if (output_path) {
+        await saveRender(entry, output_path);
+        return {
+          content: [{ type: "text", text: `Saved to ${output_path}` }],
+        };
+      }
+
+      // SVG is rendered as text
+      if (typeof entry.content === "string") {
+        return {
+          content: [{ type: "text", text: entry.content }],
+        };
+      }
+
+      // PNG/PDF - return as base64 (memoized on the cache entry)
+      return {
+        content: [
+          {
+            type: "image",
+            data: encodeBase64(entry),
+            mimeType: MIME_TYPES[format],
+          },
+        ],
+      };
+    } catch (error) {
+      return {
+        content: [{ type: "text", text: `Failed to render diagram: ${error instanceof Error ? error.message : String(error)}` }],
+        isError: true,
+      };
+    }
+  },
+};
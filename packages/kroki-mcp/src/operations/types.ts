@@ -8,6 +8,7 @@ export interface Operation<TArgs = unknown> {
   id: string;
   summary: string;
   detail: string;
-  argsSchema: z.ZodType<TArgs>;
+  /** Input is unknown so schemas with defaults (optional input, required output) fit */
+  argsSchema: z.ZodType<TArgs, z.ZodTypeDef, unknown>;
   execute: (args: TArgs) => Promise<CallToolResult>;
 }
@@ -0,0 +1,211 @@
+import { createHash, randomUUID } from "node:crypto";
+import { copyFile, mkdir, readdir, readFile, rename, rm, stat, utimes, writeFile } from "node:fs/promises";
+import { homedir } from "node:os";
+import path from "node:path";
+
+export type OutputFormat = "svg" | "png" | "pdf";
+
+/** Rendered output: SVG is kept as text, binary formats as bytes */
+export type RenderedContent = string | Buffer;
+
+/**
+ * Cached render.
+ * base64 is filled on first use so repeat inline responses skip re-encoding.
+ * cachePath is set when the same content is stored in the disk tier.
+ */
+export interface RenderCacheEntry {
+  content: RenderedContent;
+  base64?: string;
+  cachePath?: string;
+}
+
+/** Maximum number of rendered diagrams kept in memory */
+export const RENDER_CACHE_MAX_ENTRIES = 256;
+
+/** Maximum number of rendered diagrams kept on disk */
+export const DISK_CACHE_MAX_ENTRIES = 1024;
+
+/**
+ * In-memory LRU of rendered output keyed by content hash.
+ * Map preserves insertion order, so the first key is always the least recently used.
+ */
+const renderCache = new Map<string, RenderCacheEntry>();
+
+/**
+ * Compute the content-addressed cache key for a render.
+ * The Kroki URL is part of the key so switching servers (and thus renderer versions) never serves stale output.
+ */
+export function renderCacheKey(params: {
+  krokiUrl: string;
+  tool: string;
+  format: OutputFormat;
+  diagram: string;
+}): string {
+  const { krokiUrl, tool, format, diagram } = params;
+  return createHash("sha256")
+    .update(`${krokiUrl}\0${tool}\0${format}\0${diagram}`)
+    .digest("hex");
+}
+
+/**
+ * Get cached output and mark it as most recently used
+ */
+export function getCachedRender(key: string): RenderCacheEntry | undefined {
+  const entry = renderCache.get(key);
+  if (entry === undefined) return undefined;
+  renderCache.delete(key);
+  renderCache.set(key, entry);
+  return entry;
+}
+
+/**
+ * Store rendered output, evicting the least recently used entry when full
+ */
+export function setCachedRender(key: string, entry: RenderCacheEntry): void {
+  renderCache.delete(key);
+  renderCache.set(key, entry);
+  if (renderCache.size > RENDER_CACHE_MAX_ENTRIES) {
+    const oldest = renderCache.keys().next().value;
+    if (oldest !== undefined) renderCache.delete(oldest);
+  }
+}
+
+/**
+ * Base64 of a cached render, encoded once and memoized on the entry
+ */
+export function encodeBase64(entry: RenderCacheEntry): string {
+  entry.base64 ??= typeof entry.content === "string"
+    ? Buffer.from(entry.content, "utf-8").toString("base64")
+    : entry.content.toString("base64");
+  return entry.base64;
+}
+
+/**
+ * Write a cached render to outputPath.
+ * Entries backed by a disk cache file are copied by the kernel (fs.copyFile) instead of
+ * writing the in-memory content back out; falls back to writing content if the file was swept.
+ */
+export async function saveRender(entry: RenderCacheEntry, outputPath: string): Promise<void> {
+  if (entry.cachePath) {
+    try {
+      await copyFile(entry.cachePath, outputPath);
+      return;
+    } catch {
+      // Cache file gone (swept or cleared) - write from memory instead
+    }
+  }
+  await writeFile(outputPath, entry.content);
+}
+
+/**
+ * Drop all in-memory cached output (the disk tier is left intact)
+ */
+export function clearRenderCache(): void {
+  renderCache.clear();
+}
+
+/**
+ * Number of cached entries
+ */
+export function renderCacheSize(): number {
+  return renderCache.size;
+}
+
+// ─── Disk tier ────────────────────────────────────────────────────────────
+
+/** Writes between disk sweeps; the directory may exceed its limit by up to this many files */
+export const DISK_CACHE_SWEEP_INTERVAL = 64;
+
+/** Names written by the disk tier; anything else in the directory is never touched */
+const DISK_CACHE_FILE = /^[0-9a-f]{64}\.(svg|png|pdf)$/;
+
+/** KROKI_CACHE_DIR values that turn the disk tier off */
+const DISK_CACHE_DISABLED = new Set(["", "off"]);
+
+/** Disk writes in this process, used to sweep every DISK_CACHE_SWEEP_INTERVAL writes */
+let diskWriteCount = 0;
+
+/**
+ * Directory of the on-disk cache tier, or undefined when the disk tier is disabled.
+ * KROKI_CACHE_DIR overrides the default of $XDG_CACHE_HOME/kroki-mcp (~/.cache/kroki-mcp);
+ * KROKI_CACHE_DIR=off (or empty) disables it.
+ */
+export function getCacheDir(): string | undefined {
+  const override = process.env.KROKI_CACHE_DIR;
+  if (override !== undefined) {
+    return DISK_CACHE_DISABLED.has(override.trim().toLowerCase()) ? undefined : override;
+  }
+  const base = process.env.XDG_CACHE_HOME || path.join(homedir(), ".cache");
+  return path.join(base, "kroki-mcp");
+}
+
+/**
+ * Path of the cache file for a render (undefined when the disk tier is disabled)
+ */
+export function diskCachePath(key: string, format: OutputFormat): string | undefined {
+  const dir = getCacheDir();
+  return dir === undefined ? undefined : path.join(dir, `${key}.${format}`);
+}
+
+/**
+ * Read a render from the disk tier (undefined on miss, any I/O error, or when disabled).
+ * A hit refreshes the file's mtime so the sweep treats it as recently used.
+ */
+export async function readDiskCache(key: string, format: OutputFormat): Promise<RenderedContent | undefined> {
+  const file = diskCachePath(key, format);
+  if (file === undefined) return undefined;
+  try {
+    const content = format === "svg" ? await readFile(file, "utf-8") : await readFile(file);
+    const now = new Date();
+    await utimes(file, now, now).catch(() => {});
+    return content;
+  } catch {
+    return undefined;
+  }
+}
+
+/**
+ * Store a render in the disk tier and return its path (undefined if disabled or it could not be stored).
+ * Written to a unique temp file and renamed into place, so readers never see a partial file.
+ * The disk tier is best-effort: I/O errors are swallowed rather than failing the render.
+ * The directory is swept on the first write and then every DISK_CACHE_SWEEP_INTERVAL writes,
+ * so a full cache does not pay a readdir + stat per file on every miss.
+ */
+export async function writeDiskCache(key: string, format: OutputFormat, content: RenderedContent): Promise<string | undefined> {
+  const dir = getCacheDir();
+  if (dir === undefined) return undefined;
+  const file = path.join(dir, `${key}.${format}`);
+  const tmp = `${file}.${randomUUID()}.tmp`;
+  try {
+    await mkdir(dir, { recursive: true });
+    await writeFile(tmp, content);
+    await rename(tmp, file);
+  } catch {
+    await rm(tmp, { force: true }).catch(() => {});
+    return undefined;
+  }
+  if (diskWriteCount++ % DISK_CACHE_SWEEP_INTERVAL === 0) {
+    await sweepDiskCache({ dir, maxEntries: DISK_CACHE_MAX_ENTRIES }).catch(() => {});
+  }
+  return file;
+}
+
+/**
+ * Remove the least recently used cache files (by mtime) beyond maxEntries.
+ * Only files named like cache entries (<sha256>.<format>) are considered.
+ */
+export async function sweepDiskCache(params: { dir: string; maxEntries: number }): Promise<void> {
+  const { dir, maxEntries } = params;
+  const names = (await readdir(dir)).filter(name => DISK_CACHE_FILE.test(name));
+  if (names.length <= maxEntries) return;
+
+  const entries = await Promise.all(names.map(async name => {
+    const file = path.join(dir, name);
+    const info = await stat(file).catch(() => undefined);
+    return { file, mtimeMs: info?.mtimeMs ?? 0 };
+  }));
+  entries.sort((a, b) => a.mtimeMs - b.mtimeMs);
+
+  const excess = entries.slice(0, entries.length - maxEntries);
+  await Promise.all(excess.map(e => rm(e.file, { force: true })));
+}